@@ -7,13 +7,23 @@ Minimal SQLite setup - just what's needed for personal use.
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, Session
 from models import Base
+from migrations import run_migrations
 
 # Simple database setup
 engine = create_engine("sqlite:///./household_coo.db")
 SessionLocal = sessionmaker(bind=engine)
 
-# Create tables on import
-Base.metadata.create_all(engine)
+
+def init_db(bind=None):
+    """Create tables and apply migrations. Called once from app startup, not on import."""
+    bind = bind or engine
+    with bind.begin() as conn:
+        # Only takes effect before the first table exists, so new databases
+        # never need the full VACUUM that converting an old one does
+        conn.exec_driver_sql("PRAGMA auto_vacuum = INCREMENTAL")
+        Base.metadata.create_all(conn)
+    run_migrations(bind)
+
 
 def get_db() -> Session:
     """Get database session for FastAPI dependency."""
@@ -4,12 +4,41 @@ Simple FastAPI app for Household COO personal use.
 Just provides basic API endpoints for the frontend.
 """
 
-from fastapi import FastAPI, Depends
+import codecs
+import io
+import tempfile
+import threading
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from database import get_db
+from database import get_db, init_db
+import portability
 
-app = FastAPI(title="Household COO", version="1.0.0")
+
+def _warm_scoring_model():
+    """Train the local scoring model from stored tasks and feedback."""
+    from services import scoring_service
+
+    db = get_db()
+    try:
+        scoring_service.train_from_db(db)
+    finally:
+        db.close()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Set up the schema, then warm up the scoring model in the background."""
+    init_db()
+    # NumPy + training can take seconds on a Pi - don't hold up /health for it
+    threading.Thread(target=_warm_scoring_model, daemon=True).start()
+    yield
+
+
+app = FastAPI(title="Household COO", version="1.0.0", lifespan=lifespan)
 
 # Allow frontend to connect
 app.add_middleware(
@@ -20,8 +49,6 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Database is automatically initialized on import
-
 
 @app.get("/")
 def root():
@@ -35,6 +62,80 @@ def health_check():
     return {"status": "healthy", "message": "Household COO is running"}
 
 
+@app.get("/scoring/stats")
+def scoring_stats():
+    """Local scoring model hit rate and agreement with the LLM."""
+    from services import scoring_service
+
+    return scoring_service.get_scoring_stats()
+
+
+@app.get("/llm/metrics")
+def llm_metrics():
+    """LLM response validation, repair and failure rates per call type."""
+    from services import llm_service
+
+    return llm_service.get_llm_metrics()
+
+
+def _check_transfer(table: str, format: str):
+    """Reject unknown tables and formats for export/import."""
+    if table not in portability.TABLES:
+        raise HTTPException(status_code=404, detail=f"Unknown table: {table}")
+    if format not in portability.FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format: {format}")
+
+
+@app.get("/export/{table}")
+def export_table(table: str, format: str = "ndjson"):
+    """Stream a table as NDJSON or CSV."""
+    _check_transfer(table, format)
+
+    def stream():
+        db = get_db()
+        try:
+            yield from portability.export_rows(db, table, format)
+        finally:
+            db.close()
+
+    return StreamingResponse(
+        stream(),
+        media_type=portability.FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{table}.{format}"'}
+    )
+
+
+@app.post("/import/{table}")
+async def import_table(table: str, request: Request, format: str = "ndjson"):
+    """Bulk import NDJSON or CSV sent as the raw request body."""
+    _check_transfer(table, format)
+
+    # Spool the upload (to disk once it's large) so memory stays flat, checking
+    # it decodes as we go so a bad file is rejected before any rows are written
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    with tempfile.SpooledTemporaryFile(max_size=1024 * 1024) as body:
+        try:
+            async for chunk in request.stream():
+                decoder.decode(chunk)
+                body.write(chunk)
+            decoder.decode(b"", final=True)
+        except UnicodeDecodeError:
+            raise HTTPException(status_code=400, detail="Request body is not valid UTF-8")
+        body.seek(0)
+
+        def load():
+            # utf-8-sig drops the BOM spreadsheets put at the start of CSVs
+            lines = io.TextIOWrapper(body, encoding="utf-8-sig", newline="")
+            db = get_db()
+            try:
+                return portability.import_records(db, table, portability.read_records(lines, format))
+            finally:
+                lines.detach()
+                db.close()
+
+        return await run_in_threadpool(load)
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("main:app", host="0.0.0.0", port=5000, reload=True)
@@ -0,0 +1,84 @@
+"""
+Simple versioned schema migrations for Household COO.
+
+create_all() only creates missing tables, so anything that changes an existing
+table (new columns, indexes, pragmas) goes here. The applied version is stored
+in SQLite's `PRAGMA user_version`. Each step is safe to re-run, so a fresh
+database (already created from the models) just fast-forwards.
+"""
+
+import sys
+from sqlalchemy.engine import Engine
+
+
+def _add_indexes(conn):
+    """Indexes for status/date scans and feedback lookups"""
+    conn.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_tasks_status_received ON tasks (status, received_at)"
+    )
+    conn.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_budget_transactions_ts ON budget_transactions (ts)"
+    )
+    conn.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_feedback_task_id ON feedback (task_id)"
+    )
+
+
+def _add_task_closed_at(conn):
+    """Track when tasks leave 'open' so retention can age them"""
+    columns = [row[1] for row in conn.exec_driver_sql("PRAGMA table_info(tasks)")]
+    if 'closed_at' not in columns:
+        conn.exec_driver_sql("ALTER TABLE tasks ADD COLUMN closed_at DATETIME")
+
+
+def _auto_vacuum_marker(conn):
+    """No-op kept so version numbers stay stable"""
+    # auto_vacuum can't be switched on from here: it only persists before the
+    # first table exists (init_db sets it then) or after a full VACUUM, which
+    # retention.incremental_vacuum runs once for older databases.
+
+
+def _add_score_source(conn):
+    """Record where task scores came from so only real labels are trained on"""
+    for table in ['tasks', 'tasks_archive']:
+        columns = [row[1] for row in conn.exec_driver_sql(f"PRAGMA table_info({table})")]
+        if 'score_source' not in columns:
+            conn.exec_driver_sql(f"ALTER TABLE {table} ADD COLUMN score_source VARCHAR")
+
+
+MIGRATIONS = [
+    (1, "Add indexes for status, date and feedback lookups", _add_indexes),
+    (2, "Add tasks.closed_at", _add_task_closed_at),
+    (3, "No-op (auto-vacuum is handled by init_db and retention.py)", _auto_vacuum_marker),
+    (4, "Add score_source to tasks and tasks_archive", _add_score_source),
+]
+
+
+def get_version(engine: Engine) -> int:
+    """Get the schema version of the database."""
+    with engine.connect() as conn:
+        return conn.exec_driver_sql("PRAGMA user_version").scalar()
+
+
+def run_migrations(engine: Engine) -> list:
+    """
+    Apply any migrations newer than the database's version.
+
+    Args:
+        engine: SQLAlchemy engine for the SQLite database
+
+    Returns:
+        List of version numbers that were applied
+    """
+    applied = []
+    # Autocommit so PRAGMA steps apply immediately
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        version = conn.exec_driver_sql("PRAGMA user_version").scalar()
+        for number, description, migrate in MIGRATIONS:
+            if number <= version:
+                continue
+            print(f"Applying migration {number}: {description}", file=sys.stderr)
+            migrate(conn)
+            conn.exec_driver_sql(f"PRAGMA user_version = {number}")
+            applied.append(number)
+    return applied
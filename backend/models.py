@@ -6,8 +6,11 @@ Hybrid approach: Keep essential models and helpers, remove complex validation.
 
 from sqlalchemy import Column, String, Integer, Float, DateTime, Text
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import validates
 from sqlalchemy.sql import func
 import json
+import re
+from datetime import date, datetime
 from typing import List, Dict
 
 Base = declarative_base()
@@ -27,10 +30,23 @@ class Task(Base):
     importance = Column(Integer, nullable=False, default=0)  # 0-100
     urgency = Column(Integer, nullable=False, default=0)     # 0-100
     savings_score = Column(Integer, nullable=False, default=0)  # 0-100
+    score_source = Column(String, nullable=True)  # 'llm', 'local', 'default' or None if unknown
     status = Column(String, nullable=False, default='open')  # 'open', 'done', 'dismissed'
+    closed_at = Column(DateTime, nullable=True)  # Set when status leaves 'open'
     actions = Column(Text, nullable=True)  # JSON string for action links
     citations = Column(Text, nullable=True)  # JSON string for citation links
     
+    @validates('status')
+    def _track_closed_at(self, key, status):
+        """Record when the task was closed whenever status changes"""
+        if status == 'open':
+            self.closed_at = None
+        elif self.closed_at is None:
+            # Only stamp if unset, so an explicit closed_at (e.g. passed to
+            # the constructor in any keyword order) is never overwritten
+            self.closed_at = datetime.now()
+        return status
+    
     def set_actions(self, actions: List[Dict[str, str]]):
         """Set actions as JSON string"""
         self.actions = json.dumps(actions) if actions else None
@@ -118,7 +134,70 @@ class Feedback(Base):
         }
 
 
+class TaskArchive(Base):
+    """Closed tasks moved out of the live table by the retention job"""
+    __tablename__ = "tasks_archive"
+    
+    id = Column(String, primary_key=True)
+    title = Column(Text, nullable=False)
+    summary = Column(Text, nullable=False)
+    source_type = Column(String, nullable=False)
+    received_at = Column(DateTime, nullable=False)
+    due_at = Column(DateTime, nullable=True)
+    savings_usd = Column(Float, nullable=True)
+    importance = Column(Integer, nullable=False)
+    urgency = Column(Integer, nullable=False)
+    savings_score = Column(Integer, nullable=False)
+    score_source = Column(String, nullable=True)
+    status = Column(String, nullable=False)
+    closed_at = Column(DateTime, nullable=True)
+    actions = Column(Text, nullable=True)
+    citations = Column(Text, nullable=True)
+    # Latest feedback signal per dimension (1, -1 or None), folded in on archive
+    importance_feedback = Column(Integer, nullable=True)
+    urgency_feedback = Column(Integer, nullable=True)
+    savings_feedback = Column(Integer, nullable=True)
+    archived_at = Column(DateTime, nullable=False, default=func.now())
+
+
+class BudgetRollup(Base):
+    """Monthly totals for budget transactions compacted by the retention job"""
+    __tablename__ = "budget_rollups"
+    
+    month = Column(String, primary_key=True)  # 'YYYY-MM'
+    type = Column(String, primary_key=True)   # 'add' or 'spend'
+    amount_usd = Column(Float, nullable=False, default=0.0)
+    count = Column(Integer, nullable=False, default=0)
+    
+    def to_dict(self) -> Dict:
+        """Convert rollup to dictionary for API responses"""
+        return {
+            'month': self.month,
+            'type': self.type,
+            'amountUsd': self.amount_usd,
+            'count': self.count
+        }
+
+
 # Simple validation functions for personal use
+def validate_score(value) -> bool:
+    """Check a 0-100 integer score"""
+    return isinstance(value, int) and not isinstance(value, bool) and 0 <= value <= 100
+
+
+def validate_date_string(value) -> bool:
+    """Check a YYYY-MM-DD date string (None means no date)"""
+    if value is None:
+        return True
+    if not isinstance(value, str) or not re.fullmatch(r'\d{4}-\d{2}-\d{2}', value):
+        return False
+    try:
+        date.fromisoformat(value)
+        return True
+    except ValueError:
+        return False
+
+
 def validate_task_data(data: Dict) -> bool:
     """Simple validation for task data"""
     required_fields = ['title', 'summary', 'source_type']
@@ -136,10 +215,8 @@ def validate_task_data(data: Dict) -> bool:
     
     # Check numeric ranges
     for field in ['importance', 'urgency', 'savings_score']:
-        if field in data:
-            value = data[field]
-            if not isinstance(value, int) or value < 0 or value > 100:
-                return False
+        if field in data and not validate_score(data[field]):
+            return False
     
     return True
 
@@ -179,3 +256,24 @@ def validate_feedback_data(data: Dict) -> bool:
     
     return True
 
+
+def validate_budget_rollup(data: Dict) -> bool:
+    """Simple validation for monthly budget rollup data"""
+    required_fields = ['month', 'type', 'amount_usd', 'count']
+    for field in required_fields:
+        if field not in data:
+            return False
+    
+    # Check month
+    if not isinstance(data['month'], str) or not re.fullmatch(r'\d{4}-(0[1-9]|1[0-2])', data['month']):
+        return False
+    
+    # Check type
+    if data['type'] not in ['add', 'spend']:
+        return False
+    
+    # Check totals
+    if not isinstance(data['count'], int) or isinstance(data['count'], bool) or data['count'] < 0:
+        return False
+    
+    return True
@@ -0,0 +1,260 @@
+"""
+Streaming export/import for Household COO data.
+
+Tables are exported one chunk of rows at a time straight from the cursor,
+and imported in fixed-size batches through a bulk insert, so memory use stays
+flat however big the table is. Rows are keyed by column name, so an export
+can be imported again as-is.
+
+Formats: NDJSON (one JSON object per line) and CSV.
+
+Usage:
+    python portability.py export tasks > tasks.ndjson
+    python portability.py import tasks tasks.ndjson
+    python portability.py export feedback --format csv > feedback.csv
+"""
+
+import argparse
+import csv
+import io
+import json
+import re
+import sys
+from datetime import datetime
+from typing import Dict, Iterable, Iterator
+from sqlalchemy import select, DateTime, Integer, Float
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from models import (
+    Task, TaskArchive, BudgetTransaction, BudgetRollup, Feedback,
+    validate_task_data, validate_budget_transaction, validate_feedback_data,
+    validate_budget_rollup
+)
+
+TABLES = {
+    'tasks': (Task, validate_task_data),
+    'tasks_archive': (TaskArchive, validate_task_data),
+    'budget_transactions': (BudgetTransaction, validate_budget_transaction),
+    'budget_rollups': (BudgetRollup, validate_budget_rollup),
+    'feedback': (Feedback, validate_feedback_data),
+}
+
+FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+CHUNK_SIZE = 500
+
+
+def _columns(table: str):
+    """Table columns in declaration order"""
+    model, _ = TABLES[table]
+    return list(model.__table__.columns)
+
+
+def _to_text(value):
+    """Convert a column value to something JSON/CSV can hold"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _from_text(column, value):
+    """
+    Convert an imported value back to the column's Python type.
+
+    CSV gives strings for everything, so numeric/date strings are parsed;
+    otherwise the value must already have the column's type.
+
+    Raises:
+        ValueError: If the value doesn't fit the column
+    """
+    if value is None or value == '':
+        return None
+    if isinstance(column.type, DateTime):
+        if not isinstance(value, str):
+            raise ValueError(f"{column.name}: expected an ISO datetime string")
+        return datetime.fromisoformat(value)
+    if isinstance(column.type, Integer):
+        if isinstance(value, str) and re.fullmatch(r'-?\d+', value.strip()):
+            return int(value)
+        if not isinstance(value, int) or isinstance(value, bool):
+            raise ValueError(f"{column.name}: expected an integer")
+        return value
+    if isinstance(column.type, Float):
+        if isinstance(value, str):
+            return float(value)
+        if not isinstance(value, (int, float)) or isinstance(value, bool):
+            raise ValueError(f"{column.name}: expected a number")
+        return float(value)
+    if not isinstance(value, str):
+        raise ValueError(f"{column.name}: expected a string")
+    return value
+
+
+def _default(column):
+    """Value to use when a required column is missing from an import"""
+    if column.nullable or column.default is None:
+        return None
+    if isinstance(column.type, DateTime):
+        return datetime.now()
+    return column.default.arg
+
+
+def export_rows(db: Session, table: str, fmt: str = 'ndjson', chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    """
+    Stream a table as NDJSON or CSV text.
+
+    Args:
+        db: SQLAlchemy session (must stay open while the iterator is consumed)
+        table: One of TABLES
+        fmt: 'ndjson' or 'csv'
+        chunk_size: Rows fetched from the cursor per chunk
+
+    Yields:
+        Text chunks, each holding up to chunk_size rows
+    """
+    columns = _columns(table)
+    names = [c.name for c in columns]
+
+    result = db.execute(
+        select(*columns)
+        .order_by(*columns[0].table.primary_key.columns)
+        .execution_options(yield_per=chunk_size)
+    )
+
+    if fmt == 'csv':
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(names)
+        for rows in result.partitions():
+            writer.writerows([_to_text(v) for v in row] for row in rows)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+        return
+
+    for rows in result.partitions():
+        yield ''.join(
+            json.dumps(dict(zip(names, map(_to_text, row)))) + '\n' for row in rows
+        )
+
+
+def read_records(lines: Iterable[str], fmt: str = 'ndjson') -> Iterator[Dict]:
+    """
+    Parse NDJSON or CSV lines into raw record dicts, one at a time.
+
+    Blank NDJSON lines are skipped; malformed ones yield None.
+    """
+    if fmt == 'csv':
+        yield from csv.DictReader(lines)
+        return
+
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError:
+            yield None
+
+
+def import_records(db: Session, table: str, records: Iterable[Dict], chunk_size: int = CHUNK_SIZE) -> Dict:
+    """
+    Bulk insert records in batches, skipping invalid rows and existing keys.
+
+    Args:
+        db: SQLAlchemy session
+        table: One of TABLES
+        records: Dicts keyed by column name, e.g. from read_records()
+        chunk_size: Rows per insert batch
+
+    Returns:
+        Dictionary with counts of rows read, inserted and skipped as invalid
+    """
+    model, validate = TABLES[table]
+    columns = _columns(table)
+    keys = [c.name for c in model.__table__.primary_key.columns]
+    stats = {'read': 0, 'inserted': 0, 'invalid': 0}
+
+    batch = []
+    for record in records:
+        stats['read'] += 1
+        if not isinstance(record, dict):
+            stats['invalid'] += 1
+            continue
+        try:
+            row = {c.name: _from_text(c, record.get(c.name)) for c in columns}
+            for c in columns:
+                if row[c.name] is None:
+                    row[c.name] = _default(c)
+        except ValueError:
+            stats['invalid'] += 1
+            continue
+        if not all(row.get(k) for k in keys) or not validate({k: v for k, v in row.items() if v is not None}):
+            stats['invalid'] += 1
+            continue
+        batch.append(row)
+        if len(batch) >= chunk_size:
+            stats['inserted'] += _insert_batch(db, model, batch)
+            batch = []
+
+    if batch:
+        stats['inserted'] += _insert_batch(db, model, batch)
+    return stats
+
+
+def _insert_batch(db: Session, model, rows) -> int:
+    """Insert one batch, ignoring primary keys that already exist"""
+    keys = [c.name for c in model.__table__.primary_key.columns]
+    stmt = sqlite_insert(model.__table__).on_conflict_do_nothing(index_elements=keys)
+    result = db.connection().execute(stmt, rows)
+    db.commit()
+    return result.rowcount
+
+
+def main():
+    from database import get_db, init_db
+
+    parser = argparse.ArgumentParser(description="Export or import Household COO data")
+    parser.add_argument('action', choices=['export', 'import'])
+    parser.add_argument('table', choices=list(TABLES))
+    parser.add_argument('path', nargs='?', default='-', help="File to read/write ('-' for stdin/stdout)")
+    parser.add_argument('--format', choices=list(FORMATS), default='ndjson')
+    args = parser.parse_args()
+
+    init_db()
+    db = get_db()
+    try:
+        if args.action == 'export':
+            out = sys.stdout if args.path == '-' else open(args.path, 'w', newline='')
+            try:
+                for chunk in export_rows(db, args.table, args.format):
+                    out.write(chunk)
+            finally:
+                if out is not sys.stdout:
+                    out.close()
+        else:
+            # utf-8-sig drops the BOM spreadsheets put at the start of CSVs
+            if args.path == '-':
+                src = io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8-sig', newline='')
+            else:
+                src = open(args.path, encoding='utf-8-sig', newline='')
+            try:
+                stats = import_records(db, args.table, read_records(src, args.format))
+            except UnicodeDecodeError as e:
+                sys.exit(f"Import stopped, input is not valid UTF-8: {e}")
+            finally:
+                src.close()
+            print(f"Read {stats['read']}, inserted {stats['inserted']}, "
+                  f"skipped {stats['invalid']} invalid", file=sys.stderr)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
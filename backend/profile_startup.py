@@ -0,0 +1,90 @@
+"""
+Import-time profile for Household COO backend startup.
+
+Runs `python -X importtime` on the app in a fresh interpreter and reports the
+slowest top-level imports, whether any heavy SDKs were loaded eagerly, and how
+long it takes until /health answers.
+
+Usage:
+    python profile_startup.py [--top N]
+"""
+
+import argparse
+import subprocess
+import sys
+
+# Modules that should only load on first use, never at startup
+HEAVY_MODULES = ['googleapiclient', 'google_auth_oauthlib', 'openai', 'numpy']
+
+STARTUP_SCRIPT = """
+import time
+start = time.perf_counter()
+import main
+from fastapi.testclient import TestClient
+imported = time.perf_counter()
+with TestClient(main.app) as client:
+    assert client.get('/health').status_code == 200
+    ready = time.perf_counter()
+print(f"{imported - start:.3f} {ready - start:.3f}")
+"""
+
+
+def profile_imports():
+    """Return (module, cumulative_us, depth) rows for the `import main` subtree."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import main'],
+        capture_output=True, text=True, check=True
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(cumulative), depth))
+
+    # Children are printed before their parent; walk back from `main` until
+    # we reach interpreter startup imports (the previous depth-0 row)
+    end = next(i for i, row in enumerate(rows) if row[0] == 'main' and row[2] == 0)
+    subtree = [rows[end]]
+    for row in reversed(rows[:end]):
+        if row[2] == 0:
+            break
+        subtree.append(row)
+    return subtree
+
+
+def time_health():
+    """Return (import_seconds, health_ready_seconds) in a fresh interpreter."""
+    result = subprocess.run(
+        [sys.executable, '-c', STARTUP_SCRIPT],
+        capture_output=True, text=True, check=True
+    )
+    # Startup may print its own messages (e.g. migrations); timing is the last line
+    imported, ready = result.stdout.strip().splitlines()[-1].split()
+    return float(imported), float(ready)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--top', type=int, default=10, help='Top-level imports to show')
+    args = parser.parse_args()
+
+    rows = profile_imports()
+    top_level = sorted((r for r in rows if r[2] == 1), key=lambda r: r[1], reverse=True)
+
+    print(f"Slowest top-level imports (of {len(rows)} modules):")
+    for name, cumulative, _ in top_level[:args.top]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+    loaded = {name.split('.')[0] for name, _, _ in rows}
+    eager = [m for m in HEAVY_MODULES if m in loaded]
+    print(f"\nHeavy SDKs loaded at startup: {', '.join(eager) if eager else 'none'}")
+
+    imported, ready = time_health()
+    print(f"\nImport main:   {imported:.3f} s")
+    print(f"/health ready: {ready:.3f} s")
+
+
+if __name__ == "__main__":
+    main()
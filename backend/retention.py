@@ -0,0 +1,190 @@
+"""
+Retention job for Household COO.
+
+Keeps the live SQLite file small:
+- Closed tasks older than N days move to tasks_archive, with their feedback
+  folded into the archived row
+- Budget transactions older than N days are compacted into monthly rollups
+- Freed pages are handed back with an incremental vacuum
+
+Usage:
+    python retention.py [--task-days 90] [--budget-days 365]
+"""
+
+import argparse
+from datetime import datetime, timedelta
+from sqlalchemy import select, delete, and_, func, text
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from models import Task, TaskArchive, BudgetTransaction, BudgetRollup, Feedback
+
+
+def _latest_signal(dimension: str):
+    """Latest feedback signal on a task for one dimension, as a subquery"""
+    return (
+        select(Feedback.signal)
+        .where(Feedback.task_id == Task.id, Feedback.dimension == dimension)
+        .order_by(Feedback.ts.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+
+
+def archive_closed_tasks(db: Session, days: int) -> int:
+    """
+    Move done/dismissed tasks closed more than `days` ago into tasks_archive.
+
+    Tasks closed before closed_at existed fall back to received_at.
+
+    Returns:
+        Number of tasks archived
+    """
+    cutoff = datetime.now() - timedelta(days=days)
+    closed = and_(
+        Task.status != 'open',
+        func.coalesce(Task.closed_at, Task.received_at) < cutoff
+    )
+
+    columns = [
+        'id', 'title', 'summary', 'source_type', 'received_at', 'due_at',
+        'savings_usd', 'importance', 'urgency', 'savings_score', 'score_source', 'status',
+        'closed_at', 'actions', 'citations'
+    ]
+    archive_columns = columns + ['importance_feedback', 'urgency_feedback', 'savings_feedback', 'archived_at']
+    stmt = sqlite_insert(TaskArchive).from_select(
+        archive_columns,
+        select(
+            *[getattr(Task, c) for c in columns],
+            _latest_signal('importance'),
+            _latest_signal('urgency'),
+            _latest_signal('savings'),
+            func.now()
+        ).where(closed)
+    )
+    # A task can be archived twice if it was re-imported from a backup;
+    # the newer copy replaces the old archive row
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=['id'],
+        set_={c: stmt.excluded[c] for c in archive_columns if c != 'id'}
+    ))
+
+    closed_ids = select(Task.id).where(closed)
+    db.execute(delete(Feedback).where(Feedback.task_id.in_(closed_ids)))
+    archived = db.execute(delete(Task).where(closed)).rowcount
+
+    # Feedback whose task no longer exists can't be used for anything
+    db.execute(
+        delete(Feedback).where(
+            Feedback.ts < cutoff,
+            Feedback.task_id.not_in(select(Task.id))
+        )
+    )
+    db.commit()
+    return archived
+
+
+def compact_budget_history(db: Session, days: int) -> int:
+    """
+    Fold budget transactions older than `days` into monthly rollups.
+
+    Only whole months are compacted, so a month is never split between
+    rollups and live rows.
+
+    Returns:
+        Number of transactions compacted
+    """
+    cutoff = (datetime.now() - timedelta(days=days)).replace(
+        day=1, hour=0, minute=0, second=0, microsecond=0
+    )
+    old = BudgetTransaction.ts < cutoff
+    month = func.strftime('%Y-%m', BudgetTransaction.ts)
+
+    totals = db.execute(
+        select(month, BudgetTransaction.type, func.sum(BudgetTransaction.amount_usd), func.count())
+        .where(old)
+        .group_by(month, BudgetTransaction.type)
+    ).all()
+
+    for month_key, tx_type, amount, count in totals:
+        stmt = sqlite_insert(BudgetRollup).values(
+            month=month_key, type=tx_type, amount_usd=amount, count=count
+        )
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=['month', 'type'],
+            set_={
+                'amount_usd': BudgetRollup.amount_usd + stmt.excluded.amount_usd,
+                'count': BudgetRollup.count + stmt.excluded.count
+            }
+        ))
+
+    compacted = db.execute(delete(BudgetTransaction).where(old)).rowcount
+    db.commit()
+    return compacted
+
+
+def incremental_vacuum(db: Session) -> int:
+    """
+    Release free pages back to the filesystem.
+
+    A database created before incremental auto-vacuum was enabled is first
+    converted with a one-time full VACUUM, which rewrites the whole file and
+    can take a while on a large database. Later runs are incremental.
+
+    Returns:
+        Number of free pages before vacuuming
+    """
+    free_pages = db.execute(text("PRAGMA freelist_count")).scalar()
+    mode = db.execute(text("PRAGMA auto_vacuum")).scalar()
+    db.commit()
+
+    # pysqlite's execute() stops after the first page; executescript() steps
+    # the pragma to completion (and runs VACUUM outside a transaction)
+    raw = db.get_bind().raw_connection()
+    try:
+        if mode != 2:  # 2 = INCREMENTAL
+            print("Converting database to incremental auto-vacuum (one-time full VACUUM)")
+            raw.driver_connection.executescript("PRAGMA auto_vacuum = INCREMENTAL; VACUUM;")
+        else:
+            raw.driver_connection.executescript("PRAGMA incremental_vacuum;")
+    finally:
+        raw.close()
+    return free_pages
+
+
+def run_retention(db: Session, task_days: int = 90, budget_days: int = 365) -> dict:
+    """
+    Run the full retention job.
+
+    Returns:
+        Dictionary with counts of archived tasks, compacted transactions
+        and pages freed
+    """
+    return {
+        'tasksArchived': archive_closed_tasks(db, task_days),
+        'transactionsCompacted': compact_budget_history(db, budget_days),
+        'pagesFreed': incremental_vacuum(db),
+    }
+
+
+def main():
+    from database import get_db, init_db
+
+    parser = argparse.ArgumentParser(description="Archive old tasks and compact budget history")
+    parser.add_argument('--task-days', type=int, default=90, help='Archive tasks closed this many days ago')
+    parser.add_argument('--budget-days', type=int, default=365, help='Roll up transactions older than this')
+    args = parser.parse_args()
+
+    init_db()
+    db = get_db()
+    try:
+        result = run_retention(db, args.task_days, args.budget_days)
+    finally:
+        db.close()
+
+    print(f"Archived {result['tasksArchived']} tasks")
+    print(f"Compacted {result['transactionsCompacted']} budget transactions")
+    print(f"Freed {result['pagesFreed']} pages")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,18 +3,28 @@ Services package for Household COO backend
 
 This package contains all service modules for external API integrations
 and business logic.
+
+Service modules are imported on first use so that heavy SDKs (Gmail, OpenAI,
+NumPy) don't slow down app startup.
 """
 
-from .email_service import get_recent_emails
-from .whatsapp_service import (
-    verify_webhook,
-    handle_whatsapp_message,
-    process_webhook
-)
+import importlib
+
+_EXPORTS = {
+    'get_recent_emails': 'email_service',
+    'verify_webhook': 'whatsapp_service',
+    'handle_whatsapp_message': 'whatsapp_service',
+    'process_webhook': 'whatsapp_service',
+}
+
+__all__ = list(_EXPORTS)
+
 
-__all__ = [
-    'get_recent_emails',
-    'verify_webhook',
-    'handle_whatsapp_message', 
-    'process_webhook'
-]
+def __getattr__(name):
+    """Import the owning service module when an export is first accessed"""
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module = importlib.import_module(f".{_EXPORTS[name]}", __name__)
+    value = getattr(module, name)
+    globals()[name] = value
+    return value
@@ -8,11 +8,8 @@ import os
 import base64
 import re
 from datetime import datetime, timedelta
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
+
+# Google SDK imports are deferred to call time - they are slow to load
 
 
 def get_recent_emails(hours=24, max_results=50):
@@ -22,6 +19,9 @@ def get_recent_emails(hours=24, max_results=50):
     Returns:
         List of dicts with email data: {id, subject, sender, timestamp, body}
     """
+    from googleapiclient.discovery import build
+    from googleapiclient.errors import HttpError
+
     # Authenticate
     creds = _authenticate()
     if not creds:
@@ -56,6 +56,10 @@ def get_recent_emails(hours=24, max_results=50):
 
 def _authenticate():
     """Simple authentication - returns credentials or None"""
+    from google.auth.transport.requests import Request
+    from google.oauth2.credentials import Credentials
+    from google_auth_oauthlib.flow import InstalledAppFlow
+
     SCOPES = ['https://www.googleapis.com/auth/gmail.readonly']
     creds = None
     
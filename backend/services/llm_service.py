@@ -2,11 +2,25 @@
 Simple LLM service for Household COO personal use
 
 Uses OpenAI API for task extraction, categorization, and instruction generation.
+Responses are checked against the same rules as the database models; common
+JSON glitches are repaired locally, and only the items that still fail are
+retried with a tighter prompt.
 """
 
 import os
+import re
 import json
-from openai import OpenAI
+import threading
+from models import validate_score, validate_date_string
+
+
+CALL_TYPES = ['extraction', 'categorization', 'instructions']
+MAX_RETRIES = 1
+DIMENSIONS = ['importance', 'urgency', 'savings']
+DEFAULT_SCORES = {'importance': 50, 'urgency': 50, 'savings': 0}
+
+_metrics_lock = threading.Lock()
+_metrics = {}
 
 
 # Initialize OpenAI client
@@ -15,9 +29,240 @@ def get_client():
     api_key = os.getenv('OPENAI_API_KEY')
     if not api_key or api_key == 'your_openai_api_key':
         raise ValueError("OPENAI_API_KEY not set. Please set it in your .env file")
+    # Imported here - the OpenAI SDK is slow to load and only needed for calls
+    from openai import OpenAI
     return OpenAI(api_key=api_key)
 
 
+def reset_metrics():
+    """Clear per-call-type response metrics"""
+    with _metrics_lock:
+        _metrics.clear()
+        for call_type in CALL_TYPES:
+            _metrics[call_type] = {
+                'calls': 0,      # Top-level service calls
+                'invalid': 0,    # First response had unparsable JSON or invalid items
+                'repaired': 0,   # JSON only parsed after local repair
+                'retries': 0,    # Follow-up calls for failed items
+                'failed': 0,     # Still invalid after retries - defaults used
+            }
+
+
+reset_metrics()
+
+
+def _record(call_type: str, **counts):
+    """Add to a call type's metrics"""
+    with _metrics_lock:
+        for key, value in counts.items():
+            _metrics[call_type][key] += value
+
+
+def get_llm_metrics() -> dict:
+    """
+    Report response quality per call type.
+
+    Returns:
+        Dictionary keyed by call type with raw counts plus invalidRate
+        (first responses that were unparsable or had invalid items - a
+        reply that only needed local JSON repair counts under 'repaired',
+        not here) and failureRate (calls that fell back to defaults)
+    """
+    with _metrics_lock:
+        snapshot = {k: dict(v) for k, v in _metrics.items()}
+
+    report = {}
+    for call_type, m in snapshot.items():
+        calls = m['calls']
+        report[call_type] = {
+            **m,
+            'invalidRate': m['invalid'] / calls if calls else 0.0,
+            'failureRate': m['failed'] / calls if calls else 0.0,
+        }
+    return report
+
+
+_STRING_RE = re.compile(r'"(?:\\.|[^"\\])*"')
+
+
+def _fix_outside_strings(text: str) -> str:
+    """Drop trailing commas and convert Python literals, leaving string contents alone"""
+    parts, pos = [], 0
+    for match in _STRING_RE.finditer(text):
+        parts.append(_fix_tokens(text[pos:match.start()]))
+        parts.append(match.group())
+        pos = match.end()
+    parts.append(_fix_tokens(text[pos:]))
+    return ''.join(parts)
+
+
+def _fix_tokens(segment: str) -> str:
+    """Apply token fixes to a stretch of text known to be outside any string"""
+    segment = re.sub(r',\s*([}\]])', r'\1', segment)
+    segment = re.sub(r'\bNone\b', 'null', segment)
+    segment = re.sub(r'\bTrue\b', 'true', segment)
+    return re.sub(r'\bFalse\b', 'false', segment)
+
+
+def repair_json(text: str):
+    """
+    Parse JSON from a model reply, fixing common glitches locally.
+
+    Handles code fences, prose around the object, smart quotes, trailing
+    commas, Python literals (None/True/False) and single-quoted strings.
+
+    Returns:
+        Tuple of (parsed object, whether a repair was needed)
+
+    Raises:
+        ValueError: If the reply can't be turned into JSON
+    """
+    if text is None:
+        raise ValueError("Empty response")
+    try:
+        return json.loads(text), False
+    except json.JSONDecodeError:
+        pass
+
+    cleaned = re.sub(r'```(?:json)?', '', text)
+    first, last = cleaned.find('{'), cleaned.rfind('}')
+    if first == -1 or last < first:
+        raise ValueError("No JSON object in response")
+    cleaned = cleaned[first:last + 1]
+    cleaned = cleaned.translate(str.maketrans({'\u201c': '"', '\u201d': '"'}))
+
+    candidates = [cleaned]
+    if '"' not in cleaned:
+        # Single-quoted throughout - treat those as the string delimiters
+        quoted = cleaned.translate(str.maketrans({'\u2018': "'", '\u2019': "'"}))
+        candidates.append(quoted.replace("'", '"'))
+    for candidate in candidates:
+        try:
+            return json.loads(_fix_outside_strings(candidate)), True
+        except json.JSONDecodeError:
+            continue
+    raise ValueError("Could not repair JSON response")
+
+
+def _coerce_score(value):
+    """Turn 75.0 or "75" into 75; leave anything else for validation to reject"""
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str) and value.strip().isdigit():
+        return int(value.strip())
+    return value
+
+
+def _coerce_date(value):
+    """Turn 2024/03/05 or 2024-03-05T10:00 into 2024-03-05"""
+    if value in ('', 'null', 'None'):
+        return None
+    if isinstance(value, str):
+        match = re.match(r'^(\d{4})[-/.](\d{1,2})[-/.](\d{1,2})', value.strip())
+        if match:
+            year, month, day = match.groups()
+            return f"{year}-{int(month):02d}-{int(day):02d}"
+    return value
+
+
+def _check_task(item) -> tuple:
+    """
+    Validate and tidy one extracted task.
+
+    Returns:
+        Tuple of (cleaned task or None, list of problems)
+    """
+    if not isinstance(item, dict):
+        return None, ["not an object"]
+
+    title = item.get('title')
+    summary = item.get('summary')
+    due_date = _coerce_date(item.get('due_date'))
+
+    problems = []
+    if not isinstance(title, str) or not title.strip():
+        problems.append("title must be a non-empty string")
+    if not isinstance(summary, str) or not summary.strip():
+        problems.append("summary must be a non-empty string")
+    if not validate_date_string(due_date):
+        problems.append("due_date must be YYYY-MM-DD or null")
+    if problems:
+        return None, problems
+
+    return {'title': title.strip()[:100], 'summary': summary.strip(), 'due_date': due_date}, []
+
+
+def _check_scores(result) -> tuple:
+    """
+    Validate categorization scores.
+
+    Returns:
+        Tuple of (dict of valid scores, list of dimensions that failed)
+    """
+    if not isinstance(result, dict):
+        return {}, list(DIMENSIONS)
+    scores, failed = {}, []
+    for dimension in DIMENSIONS:
+        value = _coerce_score(result.get(dimension))
+        if validate_score(value):
+            scores[dimension] = value
+        else:
+            failed.append(dimension)
+    return scores, failed
+
+
+def _check_instructions(result) -> tuple:
+    """
+    Validate generated instructions. Bad citations are dropped; bad steps fail.
+
+    Returns:
+        Tuple of (cleaned instructions or None, list of problems)
+    """
+    if not isinstance(result, dict):
+        return None, ["not an object"]
+    steps = result.get('steps')
+    if not isinstance(steps, list) or not steps or not all(isinstance(s, str) and s.strip() for s in steps):
+        return None, ["steps must be a non-empty list of strings"]
+
+    citations = [
+        {'title': c['title'], 'url': c['url']}
+        for c in result.get('citations') or []
+        if isinstance(c, dict) and isinstance(c.get('title'), str)
+        and isinstance(c.get('url'), str) and c['url'].startswith(('http://', 'https://'))
+    ]
+    return {'steps': [s.strip() for s in steps], 'citations': citations}, []
+
+
+def _complete(prompt: str, max_tokens: int, label: str):
+    """Send one JSON-mode request and return (raw reply, cost)"""
+    client = get_client()
+    response = client.chat.completions.create(
+        model="gpt-4o-mini",
+        messages=[{"role": "user", "content": prompt}],
+        response_format={"type": "json_object"},
+        max_tokens=max_tokens
+    )
+
+    # Track cost
+    usage = response.usage
+    cost = track_cost(usage.prompt_tokens, usage.completion_tokens)
+    print(f"{label} cost: ${cost:.4f}")
+
+    return response.choices[0].message.content
+
+
+def _parse(call_type: str, reply: str):
+    """Parse a reply with local repair, recording repairs; None if unparsable"""
+    try:
+        data, repaired = repair_json(reply)
+    except ValueError as e:
+        print(f"Unparsable {call_type} response: {e}")
+        return None
+    if repaired:
+        _record(call_type, repaired=1)
+    return data
+
+
 def extract_tasks_from_email(email_text: str, email_subject: str = "") -> list:
     """
     Extract actionable tasks from email content.
@@ -29,9 +274,9 @@ def extract_tasks_from_email(email_text: str, email_subject: str = "") -> list:
     Returns:
         List of task dictionaries with title, summary, and due_date
     """
+    _record('extraction', calls=1)
+    tasks = []
     try:
-        client = get_client()
-        
         prompt = f"""
 You are a helpful assistant that extracts actionable tasks from emails.
 
@@ -49,26 +294,85 @@ Return ONLY a JSON object with this structure:
 
 If there are no actionable tasks, return: {{"tasks": []}}
 """
-        
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "user", "content": prompt}],
-            response_format={"type": "json_object"},
-            max_tokens=1000
-        )
-        
-        result = json.loads(response.choices[0].message.content)
-        
-        # Track cost
-        usage = response.usage
-        cost = track_cost(usage.prompt_tokens, usage.completion_tokens)
-        print(f"Task extraction cost: ${cost:.4f}")
-        
-        return result.get('tasks', [])
+        result = _parse('extraction', _complete(prompt, 1000, "Task extraction"))
+
+        invalid = not isinstance(result, dict) or not isinstance(result.get('tasks'), list)
+        if invalid:
+            # Nothing usable - the whole extraction is the failed item
+            _record('extraction', invalid=1)
+            retry_prompt = prompt + "\nYour previous reply was not valid JSON. Return ONLY the JSON object, no other text.\n"
+            for _ in range(MAX_RETRIES):
+                _record('extraction', retries=1)
+                result = _parse('extraction', _complete(retry_prompt, 1000, "Task extraction retry"))
+                if isinstance(result, dict) and isinstance(result.get('tasks'), list):
+                    break
+            else:
+                _record('extraction', failed=1)
+                return []
+
+        failed = []
+        for item in result['tasks']:
+            task, problems = _check_task(item)
+            if task:
+                tasks.append(task)
+            else:
+                failed.append({'item': item, 'problems': problems})
+
+        if failed:
+            if not invalid:
+                _record('extraction', invalid=1)
+            for _ in range(MAX_RETRIES):
+                if not failed:
+                    break
+                _record('extraction', retries=1)
+                failed = _retry_tasks(email_subject, failed, tasks)
+            if failed:
+                _record('extraction', failed=1)
+
+        return tasks
         
     except Exception as e:
         print(f"Error extracting tasks: {e}")
-        return []
+        _record('extraction', failed=1)
+        # Keep whatever was already validated
+        return tasks
+
+
+def _retry_tasks(email_subject: str, failed: list, tasks: list) -> list:
+    """
+    Ask again for just the invalid tasks; valid fixes are appended to tasks.
+
+    At most len(failed) fixes are accepted, and titles already in tasks are
+    skipped in case the reply echoes tasks that were valid the first time.
+    """
+    prompt = f"""
+These tasks extracted from an email (subject: {email_subject}) were invalid.
+Fix ONLY these items. Rules:
+- title: non-empty string, max 100 chars
+- summary: non-empty string
+- due_date: a real date formatted YYYY-MM-DD, or null
+
+Items and problems:
+{json.dumps(failed, default=str)}
+
+Return ONLY a JSON object: {{"tasks": [{{"title": "...", "summary": "...", "due_date": "YYYY-MM-DD" or null}}]}}
+"""
+    result = _parse('extraction', _complete(prompt, 500, "Task extraction retry"))
+    if not isinstance(result, dict) or not isinstance(result.get('tasks'), list):
+        return failed
+
+    seen = {t['title'] for t in tasks}
+    fixed, still_failed = 0, []
+    for item in result['tasks']:
+        task, problems = _check_task(item)
+        if not task:
+            still_failed.append({'item': item, 'problems': problems})
+        elif task['title'] not in seen and fixed < len(failed):
+            tasks.append(task)
+            seen.add(task['title'])
+            fixed += 1
+    # Tasks missing from the reply are as unfixed as ones that came back invalid
+    return (still_failed + failed)[:len(failed) - fixed]
 
 
 def categorize_task(task_title: str, task_summary: str = "") -> dict:
@@ -82,9 +386,25 @@ def categorize_task(task_title: str, task_summary: str = "") -> dict:
     Returns:
         Dictionary with importance, urgency, and savings scores (0-100)
     """
+    scores, _ = categorize_task_with_status(task_title, task_summary)
+    return scores
+
+
+def categorize_task_with_status(task_title: str, task_summary: str = "") -> tuple:
+    """
+    Categorize a task and report whether the scores came from the LLM.
+    
+    Args:
+        task_title: Task title
+        task_summary: Task description (optional)
+    
+    Returns:
+        Tuple of (scores dict, ok) - ok is False when any score is a
+        default filled in after the call or its retry failed
+    """
+    _record('categorization', calls=1)
+    scores = {}
     try:
-        client = get_client()
-        
         prompt = f"""
 You are a helpful assistant that categorizes household tasks.
 
@@ -99,30 +419,41 @@ Score this task on three dimensions (0-100):
 Return ONLY a JSON object:
 {{"importance": 0-100, "urgency": 0-100, "savings": 0-100}}
 """
-        
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "user", "content": prompt}],
-            response_format={"type": "json_object"},
-            max_tokens=200
-        )
-        
-        result = json.loads(response.choices[0].message.content)
-        
-        # Track cost
-        usage = response.usage
-        cost = track_cost(usage.prompt_tokens, usage.completion_tokens)
-        print(f"Categorization cost: ${cost:.4f}")
-        
-        return {
-            'importance': result.get('importance', 50),
-            'urgency': result.get('urgency', 50),
-            'savings': result.get('savings', 0)
-        }
+        result = _parse('categorization', _complete(prompt, 200, "Categorization"))
+        scores, failed = _check_scores(result)
+
+        if failed:
+            _record('categorization', invalid=1)
+            for _ in range(MAX_RETRIES):
+                if not failed:
+                    break
+                _record('categorization', retries=1)
+                # Only ask for the dimensions that came back wrong
+                fields = ", ".join(f'"{d}": <integer 0-100>' for d in failed)
+                retry_prompt = f"""
+Task: {task_title}
+Details: {task_summary}
+
+Score this household task. Each value must be a whole number from 0 to 100.
+{chr(10).join(f"- {d}" for d in failed)}
+
+Return ONLY a JSON object: {{{fields}}}
+"""
+                retry = _parse('categorization', _complete(retry_prompt, 100, "Categorization retry"))
+                retry_scores, _ = _check_scores(retry)
+                for dimension in list(failed):
+                    if dimension in retry_scores:
+                        scores[dimension] = retry_scores[dimension]
+                        failed.remove(dimension)
+            if failed:
+                _record('categorization', failed=1)
+
+        return {d: scores.get(d, DEFAULT_SCORES[d]) for d in DIMENSIONS}, not failed
         
     except Exception as e:
         print(f"Error categorizing task: {e}")
-        return {'importance': 50, 'urgency': 50, 'savings': 0}
+        _record('categorization', failed=1)
+        return {d: scores.get(d, DEFAULT_SCORES[d]) for d in DIMENSIONS}, False
 
 
 def generate_instructions(task_title: str, task_summary: str = "") -> dict:
@@ -136,9 +467,8 @@ def generate_instructions(task_title: str, task_summary: str = "") -> dict:
     Returns:
         Dictionary with steps (list) and citations (list of dicts)
     """
+    _record('instructions', calls=1)
     try:
-        client = get_client()
-        
         prompt = f"""
 You are a helpful assistant that creates step-by-step instructions.
 
@@ -156,28 +486,31 @@ Return ONLY a JSON object:
 
 If no external resources are needed, use empty array for citations.
 """
-        
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "user", "content": prompt}],
-            response_format={"type": "json_object"},
-            max_tokens=1500
-        )
-        
-        result = json.loads(response.choices[0].message.content)
-        
-        # Track cost
-        usage = response.usage
-        cost = track_cost(usage.prompt_tokens, usage.completion_tokens)
-        print(f"Instruction generation cost: ${cost:.4f}")
-        
-        return {
-            'steps': result.get('steps', []),
-            'citations': result.get('citations', [])
-        }
+        result = _parse('instructions', _complete(prompt, 1500, "Instruction generation"))
+        instructions, problems = _check_instructions(result)
+
+        if problems:
+            _record('instructions', invalid=1)
+            retry_prompt = prompt + (
+                "\nYour previous reply was invalid: " + "; ".join(problems) +
+                ". Return ONLY the JSON object. \"steps\" must be a non-empty list of strings; "
+                "each citation needs a \"title\" and an http(s) \"url\".\n"
+            )
+            for _ in range(MAX_RETRIES):
+                _record('instructions', retries=1)
+                result = _parse('instructions', _complete(retry_prompt, 1500, "Instruction generation retry"))
+                instructions, problems = _check_instructions(result)
+                if not problems:
+                    break
+            if problems:
+                _record('instructions', failed=1)
+                return {'steps': [], 'citations': []}
+
+        return instructions
         
     except Exception as e:
         print(f"Error generating instructions: {e}")
+        _record('instructions', failed=1)
         return {'steps': [], 'citations': []}
 
 
@@ -0,0 +1,350 @@
+"""
+Local task scoring for Household COO
+
+Small ridge-regression model trained from past LLM scores and thumbs
+up/down feedback. Scores most tasks locally and only falls back to
+llm_service.categorize_task when the model isn't confident.
+"""
+
+import random
+import re
+import threading
+import zlib
+import numpy as np
+
+from .llm_service import categorize_task_with_status
+
+
+DIMENSIONS = ['importance', 'urgency', 'savings']
+SOURCES = ['gmail', 'whatsapp']
+
+# Hashed bag-of-words over title + summary, plus a source one-hot and bias
+HASH_DIM = 512
+N_FEATURES = HASH_DIM + len(SOURCES) + 1
+
+RIDGE = 1.0            # Regularisation (prior precision)
+MIN_SAMPLES = 20       # Don't score locally until we've seen this many tasks
+MAX_LEVERAGE = 0.15    # Max x'A^-1x before we consider a task "unfamiliar"
+AGREE_TOLERANCE = 15   # Local and LLM scores within this many points agree
+AUDIT_RATE = 0.05      # Share of confident tasks also sent to the LLM to check local scores
+MAX_RANK_ONE_ROWS = 8  # Update A^-1 row by row up to this many rows; re-invert beyond
+
+# Feedback weights: thumbs up trusts the stored score more, thumbs down drops it
+FEEDBACK_WEIGHT = {1: 3.0, -1: 0.0}
+
+_TOKEN_RE = re.compile(r"[a-z0-9$]+")
+
+_lock = threading.Lock()
+_model = {}
+_stats = {}
+
+
+def reset_model():
+    """Clear the model and stats (used on startup and in tests)"""
+    with _lock:
+        _model.clear()
+        _model.update({
+            'A': np.stack([np.eye(N_FEATURES) * RIDGE for _ in DIMENSIONS]),
+            'b': np.zeros((len(DIMENSIONS), N_FEATURES)),
+            'x_sum': np.zeros((len(DIMENSIONS), N_FEATURES)),
+            'y_sum': np.zeros(len(DIMENSIONS)),
+            'w_sum': np.zeros(len(DIMENSIONS)),
+            'mean': np.zeros(len(DIMENSIONS)),
+            'samples': 0,
+            'A_inv': None,
+            'weights': None,
+        })
+        _stats.clear()
+        _stats.update({
+            'local': 0,
+            'llm': 0,
+            'compared': 0,
+            'agreed': 0,
+            'abs_error': 0.0,
+            'audited': 0,
+            'audit_agreed': 0,
+            'audit_abs_error': 0.0,
+            'llm_failed': 0,
+        })
+
+
+reset_model()
+
+
+def featurize(titles, summaries, sources) -> np.ndarray:
+    """
+    Build unit-normalised feature rows for a batch of tasks.
+
+    Args:
+        titles: List of task titles
+        summaries: List of task summaries (None allowed)
+        sources: List of source types ('gmail' or 'whatsapp')
+
+    Returns:
+        Array of shape (n, N_FEATURES)
+    """
+    n = len(titles)
+    X = np.zeros((n, N_FEATURES))
+
+    rows, cols = [], []
+    for i, (title, summary) in enumerate(zip(titles, summaries)):
+        text = f"{title or ''} {summary or ''}".lower()
+        tokens = _TOKEN_RE.findall(text)
+        rows.extend([i] * len(tokens))
+        cols.extend(zlib.crc32(t.encode()) % HASH_DIM for t in tokens)
+    if rows:
+        np.add.at(X, (np.array(rows), np.array(cols)), 1.0)
+
+    # Damp repeated words so long summaries don't dominate
+    np.sqrt(X[:, :HASH_DIM], out=X[:, :HASH_DIM])
+
+    source_idx = np.array([SOURCES.index(s) if s in SOURCES else -1 for s in sources], dtype=int)
+    known = source_idx >= 0
+    X[np.nonzero(known)[0], HASH_DIM + source_idx[known]] = 1.0
+    X[:, -1] = 1.0
+
+    return X / np.linalg.norm(X, axis=1, keepdims=True)
+
+
+def learn(X: np.ndarray, y: np.ndarray, w: np.ndarray = None, new_rows: bool = True):
+    """
+    Add training rows to the model.
+
+    Args:
+        X: Feature rows from featurize(), shape (n, N_FEATURES)
+        y: Scores per dimension, shape (n, 3) in DIMENSIONS order
+        w: Optional per-row, per-dimension weights, shape (n, 3)
+        new_rows: False when re-weighting rows that were already learned
+    """
+    if w is None:
+        w = np.ones_like(y, dtype=float)
+    with _lock:
+        for d in range(len(DIMENSIONS)):
+            Xw = X * w[:, d:d + 1]
+            _model['A'][d] += Xw.T @ X
+            _model['b'][d] += Xw.T @ y[:, d]
+            _model['x_sum'][d] += Xw.sum(axis=0)
+            _model['y_sum'][d] += w[:, d] @ y[:, d]
+            _model['w_sum'][d] += w[:, d].sum()
+        if new_rows:
+            _model['samples'] += len(X)
+
+        # Sherman-Morrison keeps A^-1 current for a few rows without a full
+        # re-inversion. Work on a copy - predict() may be reading the old one.
+        A_inv = _model['A_inv']
+        if A_inv is not None and len(X) <= MAX_RANK_ONE_ROWS:
+            A_inv = A_inv.copy()
+            for d in range(len(DIMENSIONS)):
+                for x, weight in zip(X, w[:, d]):
+                    if weight == 0:
+                        continue
+                    u = A_inv[d] @ x
+                    A_inv[d] -= weight * np.outer(u, u) / (1.0 + weight * (x @ u))
+            _model['A_inv'] = A_inv
+        else:
+            _model['A_inv'] = None
+        _model['weights'] = None
+
+
+def _base_weight(score_source) -> float:
+    """Training weight for a stored row before feedback: only LLM scores are labels"""
+    return 1.0 if score_source == 'llm' else 0.0
+
+
+def train_from_db(db):
+    """
+    Rebuild the model from stored tasks, archived tasks and feedback.
+
+    Only LLM-scored rows are used as labels. Local predictions, defaults from
+    failed calls and rows of unknown origin are skipped unless a thumbs up
+    confirms that dimension's score.
+
+    Args:
+        db: SQLAlchemy session
+    """
+    from models import Task, TaskArchive, Feedback
+
+    tasks = db.query(
+        Task.id, Task.title, Task.summary, Task.source_type,
+        Task.importance, Task.urgency, Task.savings_score, Task.score_source
+    ).all()
+    archived = db.query(
+        TaskArchive.title, TaskArchive.summary, TaskArchive.source_type,
+        TaskArchive.importance, TaskArchive.urgency, TaskArchive.savings_score, TaskArchive.score_source,
+        TaskArchive.importance_feedback, TaskArchive.urgency_feedback, TaskArchive.savings_feedback
+    ).all()
+    if not tasks and not archived:
+        return
+
+    rows = tasks + archived
+    w = np.array([[_base_weight(t.score_source)] * len(DIMENSIONS) for t in rows])
+
+    index = {t.id: i for i, t in enumerate(tasks)}
+    feedback = db.query(Feedback.task_id, Feedback.dimension, Feedback.signal).order_by(Feedback.ts)
+    for task_id, dimension, signal in feedback:
+        if task_id in index and dimension in DIMENSIONS:
+            i = index[task_id]
+            w[i, DIMENSIONS.index(dimension)] = FEEDBACK_WEIGHT.get(signal, _base_weight(rows[i].score_source))
+
+    # Archived rows carry their feedback with them
+    for i, t in enumerate(archived, start=len(tasks)):
+        for d, signal in enumerate([t.importance_feedback, t.urgency_feedback, t.savings_feedback]):
+            w[i, d] = FEEDBACK_WEIGHT.get(signal, _base_weight(t.score_source))
+
+    keep = w.any(axis=1)
+    rows = [t for t, k in zip(rows, keep) if k]
+    w = w[keep]
+    reset_model()
+    if not rows:
+        return
+
+    X = featurize([t.title for t in rows], [t.summary for t in rows], [t.source_type for t in rows])
+    y = np.array([[t.importance, t.urgency, t.savings_score] for t in rows], dtype=float)
+
+    learn(X, y, w)
+
+
+def learn_feedback(task, dimension: str, signal: int, previous_signal: int = None):
+    """
+    Apply a single thumbs up/down to the live model.
+
+    Args:
+        task: Task model instance the feedback refers to
+        dimension: 'importance', 'urgency', or 'savings'
+        signal: 1 or -1
+        previous_signal: Earlier feedback on the same task/dimension, if any
+
+    Uses task.score_source to know the row's weight before feedback, matching
+    train_from_db.
+    """
+    if dimension not in DIMENSIONS:
+        return
+    X = featurize([task.title], [task.summary], [task.source_type])
+    y = np.array([[task.importance, task.urgency, task.savings_score]], dtype=float)
+    w = np.zeros((1, len(DIMENSIONS)))
+    # The row is already in the model at its old weight; shift it to the new one
+    base = _base_weight(task.score_source)
+    old_weight = FEEDBACK_WEIGHT.get(previous_signal, base)
+    w[0, DIMENSIONS.index(dimension)] = FEEDBACK_WEIGHT.get(signal, base) - old_weight
+    learn(X, y, w, new_rows=False)
+
+
+def _refit():
+    """Solve for weights, inverting A only if needed (caller holds the lock)"""
+    # Fit deviations from the mean score so regularisation shrinks towards it, not 0
+    w_sum = _model['w_sum']
+    mean = np.divide(_model['y_sum'], w_sum, out=np.zeros_like(w_sum), where=w_sum > 0)
+    b = _model['b'] - mean[:, None] * _model['x_sum']
+
+    if _model['A_inv'] is None:
+        _model['A_inv'] = np.linalg.inv(_model['A'])
+    A_inv = _model['A_inv']
+    _model['mean'] = mean
+    _model['weights'] = np.einsum('dij,dj->di', A_inv, b)
+
+
+def predict(X: np.ndarray):
+    """
+    Predict scores and confidence for feature rows.
+
+    Returns:
+        Tuple of (scores, confident) - scores is (n, 3) ints clipped to 0-100,
+        confident is an (n,) bool array
+    """
+    with _lock:
+        if _model['weights'] is None:
+            _refit()
+        weights = _model['weights']
+        mean = _model['mean']
+        A_inv = _model['A_inv']
+        samples = _model['samples']
+
+    scores = np.clip(np.rint(mean + X @ weights.T), 0, 100).astype(int)
+    # Rows are sparse, so only the touched block of A^-1 matters
+    nz = np.flatnonzero(X.any(axis=0))
+    Xs = X[:, nz]
+    leverage = ((Xs @ A_inv[:, nz][:, :, nz]) * Xs).sum(axis=2).max(axis=0)
+    confident = (leverage < MAX_LEVERAGE) & (samples >= MIN_SAMPLES)
+    return scores, confident
+
+
+def _compare(local, y, prefix: str = ''):
+    """Record how far local scores were from the LLM's (caller holds the lock)"""
+    diff = np.abs(local - y)
+    _stats[prefix + 'agreed'] += int((diff <= AGREE_TOLERANCE).all())
+    _stats[prefix + 'abs_error'] += float(diff.mean())
+
+
+def score_task(task_title: str, task_summary: str = "", source_type: str = "gmail") -> dict:
+    """
+    Score a task locally, calling the LLM only when confidence is low.
+
+    A small share of confident tasks (AUDIT_RATE) also go to the LLM so the
+    accuracy of the local scores actually served can be measured.
+
+    Args:
+        task_title: Task title
+        task_summary: Task description (optional)
+        source_type: 'gmail' or 'whatsapp'
+
+    Returns:
+        Dictionary with importance, urgency, and savings scores (0-100)
+        and 'source' set to 'local', 'llm', or 'default' (LLM call failed).
+        Store 'source' as the task's score_source so restarts only retrain
+        on real LLM labels.
+    """
+    X = featurize([task_title], [task_summary], [source_type])
+    local, confident = predict(X)
+    audit = bool(confident[0]) and random.random() < AUDIT_RATE
+
+    if confident[0] and not audit:
+        with _lock:
+            _stats['local'] += 1
+        return {**dict(zip(DIMENSIONS, local[0].tolist())), 'source': 'local'}
+
+    result, ok = categorize_task_with_status(task_title, task_summary)
+
+    with _lock:
+        _stats['llm'] += 1
+        if not ok:
+            # Defaults, not real scores - don't learn from or compare against them
+            _stats['llm_failed'] += 1
+        elif audit:
+            _stats['audited'] += 1
+            _compare(local[0], np.array([result[d] for d in DIMENSIONS]), 'audit_')
+        elif _model['samples'] > 0:
+            _stats['compared'] += 1
+            _compare(local[0], np.array([result[d] for d in DIMENSIONS]))
+
+    if ok:
+        learn(X, np.array([[result[d] for d in DIMENSIONS]], dtype=float))
+    return {**result, 'source': 'llm' if ok else 'default'}
+
+
+def get_scoring_stats() -> dict:
+    """
+    Report how often the local model was used and how well it matches the LLM.
+
+    Returns:
+        Dictionary with call counts, hit rate, agreement with LLM scores on
+        low-confidence tasks, and agreement on audited confident tasks
+    """
+    with _lock:
+        stats = dict(_stats)
+        samples = _model['samples']
+
+    total = stats['local'] + stats['llm']
+    compared = stats['compared']
+    audited = stats['audited']
+    return {
+        'trainingSamples': samples,
+        'localScored': stats['local'],
+        'llmScored': stats['llm'],
+        'llmFailed': stats['llm_failed'],
+        'hitRate': stats['local'] / total if total else 0.0,
+        'agreementRate': stats['agreed'] / compared if compared else None,
+        'meanAbsError': stats['abs_error'] / compared if compared else None,
+        'audited': audited,
+        'auditAgreementRate': stats['audit_agreed'] / audited if audited else None,
+        'auditMeanAbsError': stats['audit_abs_error'] / audited if audited else None,
+    }
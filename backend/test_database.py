@@ -7,8 +7,8 @@ Tests the basic functionality with SQLite database.
 import os
 import pytest
 from unittest.mock import patch
-from database import get_db
-from sqlalchemy import text
+from database import get_db, init_db, engine
+from sqlalchemy import text, inspect
 
 
 def test_get_db_returns_session():
@@ -33,5 +33,13 @@ def test_get_db_closes_cleanly():
     db.close()  # second close must not raise
 
 
+def test_init_db_creates_tables():
+    """Happy path: explicit schema setup creates all model tables."""
+    init_db()
+    tables = inspect(engine).get_table_names()
+    for table in ['tasks', 'budget_transactions', 'feedback']:
+        assert table in tables
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
\ No newline at end of file
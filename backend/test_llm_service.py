@@ -0,0 +1,153 @@
+"""
+Simple tests for LLM response validation and retries.
+
+The OpenAI call is patched out; replies are canned strings.
+"""
+
+import json
+import pytest
+from unittest.mock import patch
+from services import llm_service
+
+
+@pytest.fixture(autouse=True)
+def fresh_metrics():
+    llm_service.reset_metrics()
+    yield
+    llm_service.reset_metrics()
+
+
+def _replies(*texts):
+    return patch.object(llm_service, '_complete', side_effect=list(texts))
+
+
+def test_repair_json_fixes_common_glitches():
+    """Happy path: fences, prose, trailing commas and Python literals are repaired."""
+    reply = 'Here you go:\n```json\n{"importance": 80, "done": True, "note": None,}\n```'
+    data, repaired = llm_service.repair_json(reply)
+    assert repaired
+    assert data == {"importance": 80, "done": True, "note": None}
+
+
+def test_repair_json_leaves_string_contents_alone():
+    """Edge case: literal and comma fixes don't touch text inside strings."""
+    data, repaired = llm_service.repair_json('{"title": "None of these, True story", "due_date": None,}')
+    assert repaired
+    assert data == {"title": "None of these, True story", "due_date": None}
+
+
+def test_repair_json_rejects_garbage():
+    """Edge case: replies without a JSON object raise ValueError."""
+    with pytest.raises(ValueError):
+        llm_service.repair_json("I can't help with that")
+
+
+def test_categorize_valid_reply_needs_no_retry():
+    """Happy path: a clean reply is used as-is, coercing 75.0 to 75."""
+    with _replies('{"importance": 75.0, "urgency": 40, "savings": "10"}') as llm:
+        result = llm_service.categorize_task("Pay bill")
+    assert result == {'importance': 75, 'urgency': 40, 'savings': 10}
+    assert llm.call_count == 1
+    assert llm_service.get_llm_metrics()['categorization']['invalidRate'] == 0.0
+
+
+def test_categorize_retries_only_failed_dimensions():
+    """Happy path: an out-of-range score is re-asked for alone."""
+    with _replies('{"importance": 70, "urgency": 150, "savings": 5}', '{"urgency": 90}') as llm:
+        result = llm_service.categorize_task("Pay bill")
+    assert result == {'importance': 70, 'urgency': 90, 'savings': 5}
+    retry_prompt = llm.call_args_list[1].args[0]
+    assert '"urgency"' in retry_prompt
+    assert '"importance"' not in retry_prompt
+
+    metrics = llm_service.get_llm_metrics()['categorization']
+    assert metrics['retries'] == 1
+    assert metrics['failed'] == 0
+
+
+def test_categorize_rejects_boolean_scores():
+    """Edge case: JSON true is not a score and is retried."""
+    with _replies('{"importance": true, "urgency": 40, "savings": 5}', '{"importance": 65}'):
+        result = llm_service.categorize_task("Pay bill")
+    assert result == {'importance': 65, 'urgency': 40, 'savings': 5}
+
+
+def test_categorize_falls_back_per_dimension():
+    """Edge case: dimensions still invalid after retry use defaults; the rest are kept."""
+    with _replies('{"importance": 70, "urgency": "soon"}', 'not json at all'):
+        result = llm_service.categorize_task("Pay bill")
+    assert result == {'importance': 70, 'urgency': 50, 'savings': 0}
+    assert llm_service.get_llm_metrics()['categorization']['failureRate'] == 1.0
+
+
+def test_extraction_keeps_valid_tasks_and_retries_bad_dates():
+    """Happy path: fixable dates are repaired locally; bad ones are retried alone."""
+    first = {"tasks": [
+        {"title": "Pay rent", "summary": "Transfer to landlord", "due_date": "2024/03/01"},
+        {"title": "Book vet", "summary": "Annual shots", "due_date": "next Tuesday"},
+    ]}
+    retry = {"tasks": [{"title": "Book vet", "summary": "Annual shots", "due_date": "2024-03-05"}]}
+    with _replies(json.dumps(first), json.dumps(retry)) as llm:
+        tasks = llm_service.extract_tasks_from_email("...", "Reminders")
+
+    assert tasks == [
+        {'title': 'Pay rent', 'summary': 'Transfer to landlord', 'due_date': '2024-03-01'},
+        {'title': 'Book vet', 'summary': 'Annual shots', 'due_date': '2024-03-05'},
+    ]
+    assert "Pay rent" not in llm.call_args_list[1].args[0]
+
+
+def test_extraction_retry_ignores_echoed_tasks():
+    """Edge case: a retry that repeats an accepted task doesn't duplicate it."""
+    first = {"tasks": [
+        {"title": "Pay rent", "summary": "Transfer to landlord", "due_date": None},
+        {"title": "Book vet", "summary": "Annual shots", "due_date": "soon"},
+    ]}
+    retry = {"tasks": [
+        {"title": "Pay rent", "summary": "Transfer to landlord", "due_date": None},
+        {"title": "Book vet", "summary": "Annual shots", "due_date": None},
+        {"title": "Extra", "summary": "Not asked for", "due_date": None},
+    ]}
+    with _replies(json.dumps(first), json.dumps(retry)):
+        tasks = llm_service.extract_tasks_from_email("...", "Reminders")
+    assert [t['title'] for t in tasks] == ["Pay rent", "Book vet"]
+    assert llm_service.get_llm_metrics()['extraction']['failed'] == 0
+
+
+def test_extraction_counts_tasks_missing_from_retry_as_failed():
+    """Edge case: a retry reply that leaves out the bad task records a failure."""
+    first = {"tasks": [
+        {"title": "Pay rent", "summary": "Transfer to landlord", "due_date": None},
+        {"title": "Book vet", "summary": "Annual shots", "due_date": "soon"},
+    ]}
+    for retry in ({"tasks": []}, {"tasks": [first["tasks"][0]]}):
+        llm_service.reset_metrics()
+        with _replies(json.dumps(first), json.dumps(retry)):
+            tasks = llm_service.extract_tasks_from_email("...", "Reminders")
+        assert [t['title'] for t in tasks] == ["Pay rent"]
+        assert llm_service.get_llm_metrics()['extraction']['failureRate'] == 1.0
+
+
+def test_extraction_unparsable_twice_returns_empty():
+    """Edge case: two unusable replies record a failure and return no tasks."""
+    with _replies('oops', '{"tasks": "none"}'):
+        assert llm_service.extract_tasks_from_email("...") == []
+    metrics = llm_service.get_llm_metrics()['extraction']
+    assert metrics['invalid'] == 1
+    assert metrics['failed'] == 1
+
+
+def test_instructions_drop_bad_citations():
+    """Happy path: citations without an http(s) url are dropped without a retry."""
+    reply = {"steps": ["Call the clinic"], "citations": [
+        {"title": "Clinic", "url": "https://example.com"},
+        {"title": "Broken", "url": "example.com"},
+    ]}
+    with _replies(json.dumps(reply)) as llm:
+        result = llm_service.generate_instructions("Book vet")
+    assert result == {'steps': ["Call the clinic"], 'citations': [{"title": "Clinic", "url": "https://example.com"}]}
+    assert llm.call_count == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
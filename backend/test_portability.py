@@ -0,0 +1,170 @@
+"""
+Simple tests for streaming export/import.
+
+Round-trips each table through NDJSON and CSV using a throwaway database.
+"""
+
+import json
+from datetime import datetime
+import pytest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from models import Base, Task, TaskArchive, BudgetTransaction, BudgetRollup, Feedback
+import portability
+
+
+@pytest.fixture
+def make_db(tmp_path):
+    engines = []
+
+    def make(name='test.db'):
+        engine = create_engine(f"sqlite:///{tmp_path / name}")
+        Base.metadata.create_all(engine)
+        engines.append(engine)
+        return sessionmaker(bind=engine)
+
+    yield make
+    for engine in engines:
+        engine.dispose()
+
+
+def _seed(db):
+    tasks = [
+        Task(id=f"t{i}", title=f"Task {i}", summary="Details", source_type='gmail',
+             received_at=datetime(2024, 1, 1, 9, i), importance=i, urgency=50,
+             savings_score=0, status='open', actions=json.dumps([{"label": "Pay"}]))
+        for i in range(7)
+    ]
+    tasks[0].due_at = datetime(2024, 2, 1)
+    tasks[0].savings_usd = 12.5
+    db.add_all(tasks)
+    db.add(BudgetTransaction(id='b1', type='spend', amount_usd=0.01, ts=datetime(2024, 1, 2), note=None))
+    db.add(Feedback(id='f1', task_id='t1', dimension='urgency', signal=-1, ts=datetime(2024, 1, 3)))
+    db.add(TaskArchive(id='a1', title="Old", summary="Done", source_type='whatsapp',
+                       received_at=datetime(2023, 1, 1), importance=10, urgency=20, savings_score=0,
+                       status='done', closed_at=datetime(2023, 1, 5), urgency_feedback=1,
+                       archived_at=datetime(2023, 6, 1)))
+    db.add_all([
+        BudgetRollup(month='2023-01', type='spend', amount_usd=1.25, count=40),
+        BudgetRollup(month='2023-01', type='add', amount_usd=10.0, count=1),
+    ])
+    db.commit()
+
+
+def _dump(db, table):
+    model, _ = portability.TABLES[table]
+    return sorted(
+        tuple(getattr(row, c.name) for c in model.__table__.columns)
+        for row in db.query(model)
+    )
+
+
+@pytest.mark.parametrize("fmt", ["ndjson", "csv"])
+@pytest.mark.parametrize("table", list(portability.TABLES))
+def test_round_trip(make_db, fmt, table):
+    """Happy path: export then import reproduces every row and column."""
+    source, target = make_db('source.db')(), make_db('target.db')()
+    _seed(source)
+
+    chunks = list(portability.export_rows(source, table, fmt, chunk_size=3))
+    lines = ''.join(chunks).splitlines(keepends=True)
+    stats = portability.import_records(target, table, portability.read_records(lines, fmt), chunk_size=2)
+
+    assert stats['invalid'] == 0
+    assert stats['inserted'] == stats['read']
+    assert _dump(target, table) == _dump(source, table)
+
+
+def test_export_is_chunked(make_db):
+    """Happy path: rows come out in chunk_size pieces, not all at once."""
+    db = make_db()()
+    _seed(db)
+    chunks = list(portability.export_rows(db, 'tasks', 'ndjson', chunk_size=3))
+    assert [c.count('\n') for c in chunks] == [3, 3, 1]
+
+
+def test_import_skips_invalid_and_duplicate_rows(make_db):
+    """Edge case: bad rows are counted, existing ids are left alone."""
+    db = make_db()()
+    _seed(db)
+    lines = [
+        json.dumps({"id": "t0", "title": "Changed", "summary": "x", "source_type": "gmail"}),
+        json.dumps({"id": "new", "title": "New", "summary": "x", "source_type": "gmail"}),
+        json.dumps({"id": "bad", "title": "Bad", "summary": "x", "source_type": "fax"}),
+        json.dumps({"id": "range", "title": "T", "summary": "x", "source_type": "gmail", "urgency": 150}),
+        "{not json",
+        "",
+    ]
+    stats = portability.import_records(db, 'tasks', portability.read_records(lines))
+
+    assert stats == {'read': 5, 'inserted': 1, 'invalid': 3}
+    assert db.get(Task, 't0').title == "Task 0"
+    new = db.get(Task, 'new')
+    assert new.status == 'open'
+    assert new.received_at is not None
+
+
+def test_import_rejects_badly_typed_values(make_db):
+    """Edge case: values of the wrong type are counted invalid instead of crashing or being coerced."""
+    db = make_db()()
+    base = {"title": "T", "summary": "x", "source_type": "gmail"}
+    lines = [json.dumps({**base, "id": f"bad{i}", **bad}) for i, bad in enumerate([
+        {"actions": [{"label": "Pay"}]},
+        {"received_at": 5},
+        {"importance": 7.9},
+        {"importance": True},
+        {"savings_usd": "lots"},
+    ])] + [json.dumps({**base, "id": "ok", "importance": 7})]
+
+    stats = portability.import_records(db, 'tasks', portability.read_records(lines))
+
+    assert stats == {'read': 6, 'inserted': 1, 'invalid': 5}
+    assert db.get(Task, 'ok').importance == 7
+
+
+def test_import_composite_key_skips_existing(make_db):
+    """Edge case: budget_rollups conflicts are detected on (month, type)."""
+    db = make_db()()
+    _seed(db)
+    lines = [
+        json.dumps({"month": "2023-01", "type": "spend", "amount_usd": 99.0, "count": 1}),
+        json.dumps({"month": "2023-02", "type": "spend", "amount_usd": 2.0, "count": 3}),
+        json.dumps({"month": "2023-13", "type": "spend", "amount_usd": 2.0, "count": 3}),
+    ]
+    stats = portability.import_records(db, 'budget_rollups', portability.read_records(lines))
+    assert stats == {'read': 3, 'inserted': 1, 'invalid': 1}
+    assert db.get(BudgetRollup, ('2023-01', 'spend')).amount_usd == 1.25
+
+
+def test_endpoints_round_trip(make_db):
+    """Happy path: /export output can be posted straight back to /import."""
+    import main
+    source, target = make_db('source.db'), make_db('target.db')
+    seed = source()
+    _seed(seed)
+    seed.close()
+
+    with TestClient(main.app) as client:
+        with patch.object(main, 'get_db', source):
+            exported = client.get("/export/tasks?format=csv")
+        assert exported.status_code == 200
+        assert exported.headers['content-type'].startswith('text/csv')
+
+        with patch.object(main, 'get_db', target):
+            imported = client.post("/import/tasks?format=csv", content=exported.content)
+        assert imported.json() == {'read': 7, 'inserted': 7, 'invalid': 0}
+
+        with patch.object(main, 'get_db', target):
+            bom = client.post("/import/tasks?format=csv", content=b"\xef\xbb\xbf" + exported.content)
+            bad = client.post("/import/tasks", content=b'{"id": "x", "title": "\xff"}\n')
+        assert bom.json() == {'read': 7, 'inserted': 0, 'invalid': 0}
+        assert bad.status_code == 400
+
+        assert client.get("/export/nope").status_code == 404
+        assert client.get("/export/tasks?format=xml").status_code == 400
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,188 @@
+"""
+Simple tests for the local scoring model.
+
+Trains on synthetic LLM scores and checks when the LLM is still called.
+"""
+
+import numpy as np
+import pytest
+from unittest.mock import patch
+from services import scoring_service
+
+
+TRAINING = [
+    ("Pay electricity bill", "Monthly bill due Friday", "gmail", (80, 90, 10)),
+    ("Renew car insurance", "Compare quotes to save money", "gmail", (85, 60, 70)),
+    ("Buy birthday gift", "Party on Saturday", "whatsapp", (40, 70, 0)),
+]
+
+
+@pytest.fixture(autouse=True)
+def fresh_model():
+    scoring_service.reset_model()
+    with patch.object(scoring_service, 'AUDIT_RATE', 0.0):
+        yield
+    scoring_service.reset_model()
+
+
+def _train(repeats=10):
+    rows = TRAINING * repeats
+    X = scoring_service.featurize([r[0] for r in rows], [r[1] for r in rows], [r[2] for r in rows])
+    y = np.array([r[3] for r in rows], dtype=float)
+    scoring_service.learn(X, y)
+
+
+def test_featurize_rows_are_unit_length():
+    """Happy path: feature rows are normalised, including empty text."""
+    X = scoring_service.featurize(["Call dentist", ""], ["", None], ["gmail", "unknown"])
+    assert X.shape == (2, scoring_service.N_FEATURES)
+    assert np.allclose(np.linalg.norm(X, axis=1), 1.0)
+
+
+def test_untrained_model_calls_llm():
+    """Edge case: with no training data every task goes to the LLM."""
+    llm_scores = {'importance': 70, 'urgency': 40, 'savings': 5}
+    with patch.object(scoring_service, 'categorize_task_with_status', return_value=(llm_scores, True)) as llm:
+        result = scoring_service.score_task("Call dentist", "Book a checkup")
+    llm.assert_called_once()
+    assert result['source'] == 'llm'
+    assert result['importance'] == 70
+    assert scoring_service.get_scoring_stats()['llmScored'] == 1
+
+
+def test_familiar_task_is_scored_locally():
+    """Happy path: a task like the training data skips the LLM."""
+    _train()
+    with patch.object(scoring_service, 'categorize_task_with_status') as llm:
+        result = scoring_service.score_task("Pay electricity bill", "Monthly bill due Friday", "gmail")
+    llm.assert_not_called()
+    assert result['source'] == 'local'
+    assert abs(result['importance'] - 80) <= 5
+    assert abs(result['urgency'] - 90) <= 5
+
+    stats = scoring_service.get_scoring_stats()
+    assert stats['localScored'] == 1
+    assert stats['hitRate'] == 1.0
+
+
+def test_unfamiliar_task_falls_back_and_reports_agreement():
+    """Edge case: new vocabulary is sent to the LLM and compared with the local guess."""
+    _train()
+    llm_scores = {'importance': 60, 'urgency': 50, 'savings': 20}
+    with patch.object(scoring_service, 'categorize_task_with_status', return_value=(llm_scores, True)) as llm:
+        result = scoring_service.score_task("Schedule chimney sweep", "Before winter starts", "whatsapp")
+    llm.assert_called_once()
+    assert result['source'] == 'llm'
+
+    stats = scoring_service.get_scoring_stats()
+    assert stats['trainingSamples'] == len(TRAINING) * 10 + 1
+    assert stats['agreementRate'] is not None
+    assert stats['meanAbsError'] >= 0
+
+
+def test_failed_llm_call_is_not_learned():
+    """Edge case: default scores from a failed LLM call aren't trained on or compared."""
+    _train()
+    defaults = {'importance': 50, 'urgency': 50, 'savings': 0}
+    with patch.object(scoring_service, 'categorize_task_with_status', return_value=(defaults, False)):
+        for _ in range(30):
+            scoring_service.score_task("Schedule chimney sweep", "Before winter starts", "whatsapp")
+
+    stats = scoring_service.get_scoring_stats()
+    assert stats['trainingSamples'] == len(TRAINING) * 10
+    assert stats['llmFailed'] == 30
+    assert stats['agreementRate'] is None
+
+    X = scoring_service.featurize(["Schedule chimney sweep"], ["Before winter starts"], ["whatsapp"])
+    _, confident = scoring_service.predict(X)
+    assert not confident[0]
+
+
+def test_confident_tasks_are_audited():
+    """Happy path: audited confident tasks go to the LLM and are reported separately."""
+    _train()
+    llm_scores = {'importance': 80, 'urgency': 90, 'savings': 10}
+    with patch.object(scoring_service, 'AUDIT_RATE', 1.0), \
+            patch.object(scoring_service, 'categorize_task_with_status', return_value=(llm_scores, True)) as llm:
+        result = scoring_service.score_task("Pay electricity bill", "Monthly bill due Friday", "gmail")
+    llm.assert_called_once()
+    assert result['source'] == 'llm'
+
+    stats = scoring_service.get_scoring_stats()
+    assert stats['audited'] == 1
+    assert stats['auditAgreementRate'] == 1.0
+    assert stats['agreementRate'] is None
+
+
+def test_rank_one_updates_match_full_inverse():
+    """Happy path: incremental A^-1 updates agree with re-inverting A."""
+    _train()
+    X = scoring_service.featurize(["Pay electricity bill"], [""], ["gmail"])
+    scoring_service.predict(X)
+
+    new = scoring_service.featurize(["Fix leaking tap", "Cancel gym"], ["Plumber", "Save $40"], ["gmail", "whatsapp"])
+    scoring_service.learn(new, np.array([[70, 60, 20], [30, 20, 90]], dtype=float), np.array([[1, 0, 3], [1, 1, 1]], dtype=float))
+    incremental, _ = scoring_service.predict(new)
+    updated = scoring_service._model['A_inv'].copy()
+
+    scoring_service._model['A_inv'] = None
+    scoring_service._model['weights'] = None
+    full, _ = scoring_service.predict(new)
+    assert np.allclose(updated, scoring_service._model['A_inv'])
+    assert (incremental == full).all()
+
+
+def test_train_from_db_uses_only_real_labels(tmp_path):
+    """Edge case: local, default and unknown scores aren't retrained on unless a thumbs up confirms them."""
+    from datetime import datetime
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from database import init_db
+    from models import Task, TaskArchive, Feedback
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    init_db(engine)
+    db = sessionmaker(bind=engine)()
+
+    def task(task_id, source):
+        return Task(id=task_id, title=f"Task {task_id}", summary="", source_type='gmail',
+                    received_at=datetime.now(), importance=50, urgency=50, savings_score=0,
+                    score_source=source)
+
+    db.add_all([
+        task('llm', 'llm'), task('local', 'local'), task('default', 'default'),
+        task('unknown', None), task('confirmed', 'local'),
+        Feedback(id='f1', task_id='confirmed', dimension='urgency', signal=1, ts=datetime.now()),
+        TaskArchive(id='archived', title="Old", summary="", source_type='gmail',
+                    received_at=datetime.now(), importance=10, urgency=10, savings_score=0,
+                    score_source='llm', status='done'),
+    ])
+    db.commit()
+
+    scoring_service.train_from_db(db)
+    assert scoring_service.get_scoring_stats()['trainingSamples'] == 3
+    assert list(scoring_service._model['w_sum']) == [2.0, 5.0, 2.0]
+
+    db.close()
+    engine.dispose()
+
+
+def test_thumbs_down_removes_training_signal():
+    """Edge case: thumbs down on a dimension drops that score from training."""
+    class FakeTask:
+        title, summary, source_type = "Water plants", "", "whatsapp"
+        importance, urgency, savings_score = 90, 90, 90
+        score_source = 'llm'
+
+    X = scoring_service.featurize([FakeTask.title], [FakeTask.summary], [FakeTask.source_type])
+    scoring_service.learn(X, np.array([[90, 90, 90]], dtype=float))
+    before, _ = scoring_service.predict(X)
+
+    scoring_service.learn_feedback(FakeTask, 'urgency', -1)
+    after, _ = scoring_service.predict(X)
+    assert after[0, 0] == before[0, 0]
+    assert after[0, 1] == 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
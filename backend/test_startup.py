@@ -0,0 +1,38 @@
+"""
+Simple tests for backend startup.
+
+Checks that heavy SDKs stay unloaded until a service actually needs them.
+"""
+
+import subprocess
+import sys
+import pytest
+from profile_startup import HEAVY_MODULES
+
+
+def test_import_main_skips_heavy_sdks():
+    """Happy path: importing the app does not load Gmail, OpenAI or NumPy."""
+    code = (
+        "import sys, main\n"
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == ''
+
+
+def test_services_exports_load_on_access():
+    """Happy path: package-level exports resolve lazily to the real functions."""
+    import services
+    from services.whatsapp_service import verify_webhook
+    assert services.verify_webhook is verify_webhook
+
+
+def test_services_unknown_attribute_raises():
+    """Edge case: unknown names still raise AttributeError."""
+    import services
+    with pytest.raises(AttributeError):
+        services.not_a_service
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])